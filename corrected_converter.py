@@ -4,11 +4,57 @@ Conversor MS Project CORREGIDO que arregla el bug de duración de MPXJ
 """
 import jpype
 import jpype.imports
+import numpy as np
 import pandas as pd
 import sys
 import os
+import hashlib
+import tempfile
+from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 import argparse
+from openpyxl.utils import get_column_letter
+
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+try:
+    import xlsxwriter  # noqa: F401
+    EXCEL_WRITE_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_WRITE_ENGINE = 'openpyxl'
+
+# Start with a heap large enough for big schedules; the maximum stays at the
+# JVM default (a quarter of RAM) and can be raised with
+# JAVA_TOOL_OPTIONS=-Xmx<size>. The JVM is started once per process and JPype
+# shuts it down at interpreter exit.
+JVM_OPTIONS = ['-Xms512m', '-XX:+UseG1GC']
+
+NATIVE_FILE = 'gant FCC.xls'
+CACHE_DIR = Path.home() / '.cache' / 'ms_project'
+CACHE_VERSION = 2  # bump when MPXJ_COLUMNS changes
+
+MPXJ_COLUMNS = [
+    'ID', 'WBS', 'Name', 'Duration_Original', 'Start', 'Finish',
+    'Percent Complete', 'Predecessors', 'Resource Names', 'Cost', 'Work',
+    'Critical', 'Milestone', 'Summary', 'Notes', 'Outline Level'
+]
+
+# MPXJ Duration.toString() is the Java double followed by the TimeUnit code,
+# e.g. "40.0eh" or "3.5d"
+MPXJ_DURATION_PATTERN = r'^(.*\d|NaN|-?Infinity)([a-z%]*)$'
+
+
+def get_excel_engine(file_path):
+    """Pick the fastest available pandas engine for reading an Excel file"""
+    if CALAMINE_AVAILABLE:
+        return 'calamine'
+    if not isinstance(file_path, (str, os.PathLike)):
+        return None  # file-like input: let pandas detect the format
+    return 'xlrd' if str(file_path).lower().endswith('.xls') else 'openpyxl'
 
 
 def setup_jvm():
@@ -17,11 +63,123 @@ def setup_jvm():
         import mpxj
         mpxj_path = Path(mpxj.__file__).parent / "lib"
         jar_files = list(mpxj_path.glob("*.jar"))
-        jpype.startJVM(classpath=[str(jar) for jar in jar_files])
+        jpype.startJVM(*JVM_OPTIONS, classpath=[str(jar) for jar in jar_files],
+                       convertStrings=True)
 
 
-def read_ms_project_corrected(file_path):
-    """Read MS Project file with CORRECTED duration handling"""
+def get_cache_path(file_path):
+    """Cache file for the MPXJ extraction of an .mpp file, keyed by its content"""
+    try:
+        mpxj_version = version('mpxj')
+    except PackageNotFoundError:
+        mpxj_version = 'unknown'
+    
+    # Un cambio de versión de MPXJ invalida las extracciones anteriores
+    digest = hashlib.blake2b(Path(file_path).read_bytes(), digest_size=16)
+    digest.update(f"v{CACHE_VERSION}-mpxj{mpxj_version}".encode())
+    return CACHE_DIR / f"{digest.hexdigest()}.pkl"
+
+
+def load_cached_tasks(cache_path):
+    """Load a cached extraction, or None if it is missing or unreadable"""
+    if not cache_path.exists():
+        return None
+    try:
+        return pd.read_pickle(cache_path)
+    except Exception as e:
+        print(f"⚠️  Caché inválida, se vuelve a leer el archivo: {e}")
+        return None
+
+
+def save_cached_tasks(raw_df, cache_path):
+    """Write the extraction atomically so an interrupted run leaves no partial file"""
+    tmp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp',
+                                         delete=False) as tmp:
+            tmp_path = tmp.name
+            raw_df.to_pickle(tmp)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar caché: {e}")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def extract_task_columns(project):
+    """Extract MPXJ task fields column by column, one Java call per getter"""
+    columns = {name: [] for name in MPXJ_COLUMNS}
+    ids = columns['ID']
+    wbs_codes = columns['WBS']
+    names = columns['Name']
+    durations = columns['Duration_Original']
+    starts = columns['Start']
+    finishes = columns['Finish']
+    percents_complete = columns['Percent Complete']
+    predecessors = columns['Predecessors']
+    resource_names = columns['Resource Names']
+    costs = columns['Cost']
+    works = columns['Work']
+    criticals = columns['Critical']
+    milestones = columns['Milestone']
+    summaries = columns['Summary']
+    notes = columns['Notes']
+    outline_levels = columns['Outline Level']
+    
+    # toArray() hands the whole task list over in a single Java call
+    for task in project.getTasks().toArray():
+        if task is None:
+            continue
+        
+        task_id = task.getID()
+        wbs = task.getWBS()
+        name = task.getName()
+        duration = task.getDuration()
+        start = task.getStart()
+        finish = task.getFinish()
+        percent_complete = task.getPercentageComplete()
+        resources = task.getResourceNames()
+        cost = task.getCost()
+        work = task.getWork()
+        critical = task.getCritical()
+        milestone = task.getMilestone()
+        summary = task.getSummary()
+        note = task.getNotes()
+        outline_level = task.getOutlineLevel()
+        
+        ids.append(task_id if task_id else 0)
+        wbs_codes.append(str(wbs) if wbs else '')
+        names.append(str(name) if name else '')
+        durations.append(str(duration) if duration else '')
+        starts.append(str(start) if start else '')
+        finishes.append(str(finish) if finish else '')
+        percents_complete.append(percent_complete.doubleValue() if percent_complete else 0)
+        predecessors.append(format_predecessors(task.getPredecessors()))
+        resource_names.append(str(resources) if resources else '')
+        costs.append(cost.doubleValue() if cost else 0)
+        works.append(str(work) if work else '')
+        criticals.append(bool(critical) if critical else False)
+        milestones.append(bool(milestone) if milestone else False)
+        summaries.append(bool(summary) if summary else False)
+        notes.append(str(note) if note else '')
+        outline_levels.append(outline_level.intValue() if outline_level else 0)
+    
+    return pd.DataFrame(columns)
+
+
+def read_mpxj_tasks(file_path, use_cache=True):
+    """Read the raw MPXJ task table, reusing a cached extraction when possible"""
+    # Sin caché se relee el archivo y se reemplaza la entrada guardada
+    cache_path = get_cache_path(file_path)
+    if use_cache:
+        raw_df = load_cached_tasks(cache_path)
+        if raw_df is not None:
+            print(f"✓ Usando caché: {cache_path}")
+            return raw_df
+    
     setup_jvm()
     
     org = jpype.JPackage("org")
@@ -30,107 +188,106 @@ def read_ms_project_corrected(file_path):
     reader = UniversalProjectReader()
     project = reader.read(file_path)
     
-    tasks_data = []
+    raw_df = extract_task_columns(project)
+    
+    save_cached_tasks(raw_df, cache_path)
     
-    # Leer también el archivo nativo para comparación
-    native_data = {}
+    return raw_df
+
+
+def load_native_durations():
+    """Load native MS Project durations (hours) as a Series indexed by task ID"""
     try:
-        df_native = pd.read_excel('gant FCC.xls', sheet_name=0)
-        for _, row in df_native.iterrows():
-            native_data[row['ID']] = {
-                'native_hours': row['Duración(horas)'],
-                'native_name': row['Nombre']
-            }
-        print(f"✓ Archivo nativo cargado: {len(native_data)} tareas")
+        # Solo se leen las columnas usadas en la corrección
+        df_native = pd.read_excel(NATIVE_FILE, sheet_name=0,
+                                  usecols=['ID', 'Duración(horas)'],
+                                  engine=get_excel_engine(NATIVE_FILE))
+        native_hours = (
+            df_native.drop_duplicates('ID', keep='last')
+            .set_index('ID')['Duración(horas)']
+            .rename('native_hours')
+        )
+        print(f"✓ Archivo nativo cargado: {len(native_hours)} tareas")
+        return native_hours
     except:
         print("⚠️  No se pudo cargar archivo nativo para corrección")
+        return pd.Series(dtype=float, name='native_hours')
+
+
+def apply_duration_corrections(raw_df, native_hours_by_id):
+    """Correct MPXJ durations against native data, vectorized over all tasks"""
+    mpxj_duration_str = raw_df['Duration_Original']
+    duration_parts = mpxj_duration_str.str.extract(MPXJ_DURATION_PATTERN)
+    duration_value = duration_parts[0].astype(float)
+    units = duration_parts[1]
+    is_elapsed_hours = units == 'eh'
+    is_days = units.isin(['d', 'ed'])
     
-    for task in project.getTasks():
-        if task is None:
-            continue
-        
-        task_id = task.getID() if task.getID() else 0
-        
-        # Obtener duración MPXJ original
-        duration_obj = task.getDuration()
-        mpxj_duration_str = str(duration_obj) if duration_obj else ''
-        
-        # Convertir duración MPXJ a horas
-        mpxj_hours = 0
-        if duration_obj:
-            if 'eh' in mpxj_duration_str:
-                mpxj_hours = duration_obj.getDuration()
-            elif 'd' in mpxj_duration_str:
-                mpxj_hours = duration_obj.getDuration() * 24
-        
-        # CORRECCIÓN: Usar duración nativa si está disponible
-        corrected_hours = mpxj_hours
-        duration_source = "MPXJ"
-        
-        if task_id in native_data:
-            native_hours = native_data[task_id]['native_hours']
-            
-            # Aplicar corrección inteligente
-            if mpxj_hours > 0:
-                factor = native_hours / mpxj_hours
-                
-                # Si el factor está cerca de 24, usar duración nativa
-                if 20 <= factor <= 28:
-                    corrected_hours = native_hours
-                    duration_source = "Nativo (corregido)"
-                    corrected_duration_str = f"{native_hours:.1f}h"
-                # Si las duraciones son similares, usar MPXJ
-                elif 0.8 <= factor <= 1.2:
-                    corrected_duration_str = mpxj_duration_str
-                    duration_source = "MPXJ (validado)"
-                # En otros casos, usar nativo pero marcar como sospechoso
-                else:
-                    corrected_hours = native_hours
-                    duration_source = f"Nativo (factor {factor:.1f}x)"
-                    corrected_duration_str = f"{native_hours:.1f}h"
-            else:
-                corrected_hours = native_data[task_id]['native_hours']
-                corrected_duration_str = f"{corrected_hours:.1f}h"
-                duration_source = "Nativo (MPXJ=0)"
-        else:
-            # Sin datos nativos, aplicar factor de corrección estimado
-            if 'eh' in mpxj_duration_str and mpxj_hours < 100:
-                corrected_hours = mpxj_hours * 24  # Factor de corrección
-                corrected_duration_str = f"{corrected_hours:.1f}h"
-                duration_source = "MPXJ corregido (x24)"
-            else:
-                corrected_duration_str = mpxj_duration_str
-        
-        task_data = {
-            'ID': task_id,
-            'WBS': str(task.getWBS()) if task.getWBS() else '',
-            'Name': str(task.getName()) if task.getName() else '',
-            'Duration_Original': mpxj_duration_str,
-            'Duration_MPXJ_Hours': mpxj_hours,
-            'Duration_Corrected': corrected_duration_str,
-            'Duration_Corrected_Hours': corrected_hours,
-            'Duration_Source': duration_source,
-            'Start': str(task.getStart()) if task.getStart() else '',
-            'Finish': str(task.getFinish()) if task.getFinish() else '',
-            'Percent Complete': (task.getPercentageComplete().doubleValue()
-                                 if task.getPercentageComplete() else 0),
-            'Predecessors': format_predecessors(task.getPredecessors()),
-            'Resource Names': (str(task.getResourceNames())
-                               if task.getResourceNames() else ''),
-            'Cost': (task.getCost().doubleValue()
-                     if task.getCost() else 0),
-            'Work': str(task.getWork()) if task.getWork() else '',
-            'Critical': bool(task.getCritical()) if task.getCritical() else False,
-            'Milestone': bool(task.getMilestone()) if task.getMilestone() else False,
-            'Summary': bool(task.getSummary()) if task.getSummary() else False,
-            'Notes': str(task.getNotes()) if task.getNotes() else '',
-            'Outline Level': (task.getOutlineLevel().intValue()
-                              if task.getOutlineLevel() else 0)
-        }
-        
-        tasks_data.append(task_data)
+    # Convertir duración MPXJ a horas
+    mpxj_hours = pd.Series(
+        np.select([is_elapsed_hours, is_days], [duration_value, duration_value * 24], 0),
+        index=raw_df.index
+    )
+    
+    # Left join con los datos nativos por ID
+    has_native = raw_df['ID'].isin(native_hours_by_id.index)
+    native_hours = pd.Series(
+        native_hours_by_id.reindex(raw_df['ID']).to_numpy(dtype=float),
+        index=raw_df.index
+    )
+    factor = native_hours / mpxj_hours.where(mpxj_hours > 0)
+    native_hours_str = native_hours.map('{:.1f}h'.format)
+    
+    x24_hours = mpxj_hours * 24  # Factor de corrección
     
-    return tasks_data, project
+    conditions = [
+        # Si el factor está cerca de 24, usar duración nativa
+        has_native & factor.between(20, 28),
+        # Si las duraciones son similares, usar MPXJ
+        has_native & factor.between(0.8, 1.2),
+        # En otros casos, usar nativo pero marcar como sospechoso
+        has_native & (mpxj_hours > 0),
+        has_native,
+        # Sin datos nativos, aplicar factor de corrección estimado
+        is_elapsed_hours & (mpxj_hours < 100),
+    ]
+    corrected_hours = np.select(
+        conditions,
+        [native_hours, mpxj_hours, native_hours, native_hours, x24_hours],
+        mpxj_hours
+    )
+    corrected_duration_str = np.select(
+        conditions,
+        [native_hours_str, mpxj_duration_str, native_hours_str, native_hours_str,
+         x24_hours.map('{:.1f}h'.format)],
+        mpxj_duration_str
+    )
+    duration_source = np.select(
+        conditions,
+        ["Nativo (corregido)", "MPXJ (validado)",
+         factor.map('Nativo (factor {:.1f}x)'.format),
+         "Nativo (MPXJ=0)", "MPXJ corregido (x24)"],
+        "MPXJ"
+    )
+    
+    tasks_df = raw_df.copy()
+    tasks_df.insert(4, 'Duration_MPXJ_Hours', mpxj_hours)
+    tasks_df.insert(5, 'Duration_Corrected', corrected_duration_str)
+    tasks_df.insert(6, 'Duration_Corrected_Hours', corrected_hours)
+    tasks_df.insert(7, 'Duration_Source', duration_source)
+    
+    return tasks_df
+
+
+def read_ms_project_corrected(file_path, use_cache=True):
+    """Read MS Project file with CORRECTED duration handling"""
+    raw_df = read_mpxj_tasks(file_path, use_cache)
+    if raw_df.empty:
+        # Sin tareas no hay nada que corregir; main lo informa
+        return raw_df
+    
+    native_hours_by_id = load_native_durations()
+    return apply_duration_corrections(raw_df, native_hours_by_id)
 
 
 def format_predecessors(predecessors):
@@ -157,10 +314,39 @@ def format_predecessors(predecessors):
     return '; '.join(formatted)
 
 
-def export_corrected_excel(tasks_df, project, output_file):
+def get_column_widths(df):
+    """Column widths sized to the longest value or header, capped at 50"""
+    value_lengths = (df.astype(str)
+                     .apply(lambda column: column.str.len())
+                     .where(df.notna(), 0)
+                     .max())
+    return [min(max(int(value_length), len(str(header))) + 2, 50)
+            for header, value_length in zip(df.columns, value_lengths.fillna(0))]
+
+
+def set_column_widths(worksheet, widths):
+    """Apply column widths to an xlsxwriter or openpyxl worksheet"""
+    for i, width in enumerate(widths):
+        if EXCEL_WRITE_ENGINE == 'xlsxwriter':
+            worksheet.set_column(i, i, width)
+        else:
+            worksheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+
+def compute_correction_stats(tasks_df):
+    """Correction source counts plus total MPXJ and corrected hours"""
+    return (tasks_df['Duration_Source'].value_counts(),
+            tasks_df['Duration_MPXJ_Hours'].sum(),
+            tasks_df['Duration_Corrected_Hours'].sum())
+
+
+def export_corrected_excel(tasks_df, output_file, stats=None):
     """Export corrected data to Excel"""
+    if stats is None:
+        stats = compute_correction_stats(tasks_df)
+    correction_stats, total_original_hours, total_corrected_hours = stats
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    with pd.ExcelWriter(output_file, engine=EXCEL_WRITE_ENGINE) as writer:
         # Export main tasks
         tasks_df.to_excel(writer, sheet_name='Tasks_Corrected', index=False)
         
@@ -168,7 +354,6 @@ def export_corrected_excel(tasks_df, project, output_file):
         summary_data = []
         
         # Estadísticas de corrección
-        correction_stats = tasks_df['Duration_Source'].value_counts()
         for source, count in correction_stats.items():
             summary_data.append({
                 'Metric': f'Tasks from {source}',
@@ -177,9 +362,6 @@ def export_corrected_excel(tasks_df, project, output_file):
             })
         
         # Agregar estadísticas generales
-        total_original_hours = tasks_df['Duration_MPXJ_Hours'].sum()
-        total_corrected_hours = tasks_df['Duration_Corrected_Hours'].sum()
-        
         summary_data.extend([
             {'Metric': 'Total tasks', 'Count': len(tasks_df), 'Percentage': '100%'},
             {'Metric': 'Original MPXJ hours', 'Count': f"{total_original_hours:.0f}", 'Percentage': ''},
@@ -191,19 +373,9 @@ def export_corrected_excel(tasks_df, project, output_file):
         summary_df.to_excel(writer, sheet_name='Correction_Summary', index=False)
         
         # Auto-adjust column widths
-        for sheet_name in writer.sheets:
-            worksheet = writer.sheets[sheet_name]
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        for sheet_name, sheet_df in [('Tasks_Corrected', tasks_df),
+                                     ('Correction_Summary', summary_df)]:
+            set_column_widths(writer.sheets[sheet_name], get_column_widths(sheet_df))
 
 
 def main():
@@ -213,6 +385,8 @@ def main():
                         default='corrected_project.xlsx')
     parser.add_argument('-v', '--verbose', action='store_true', 
                         help='Show detailed correction information')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-read the .mpp file and refresh its cached extraction')
     
     args = parser.parse_args()
     
@@ -224,18 +398,18 @@ def main():
     
     try:
         # Read and correct project data
-        tasks_data, project = read_ms_project_corrected(args.mpp_file)
+        tasks_df = read_ms_project_corrected(
+            args.mpp_file, use_cache=not args.no_cache)
         
-        if not tasks_data:
+        if tasks_df.empty:
             print("No tasks found!")
             sys.exit(1)
         
-        tasks_df = pd.DataFrame(tasks_data)
-        
         # Show correction summary
         print(f"\n✓ Processed {len(tasks_df)} tasks")
         
-        correction_summary = tasks_df['Duration_Source'].value_counts()
+        stats = compute_correction_stats(tasks_df)
+        correction_summary = stats[0]
         print("\nCorrection Summary:")
         for source, count in correction_summary.items():
             percentage = count/len(tasks_df)*100
@@ -249,7 +423,7 @@ def main():
                 print(f"  {task['Name'][:40]:40} | {task['Duration_Original']:>8} → {task['Duration_Corrected']:>10} ({task['Duration_Source']})")
         
         # Export to Excel
-        export_corrected_excel(tasks_df, project, args.output)
+        export_corrected_excel(tasks_df, args.output, stats)
         print(f"\n✓ Corrected project exported to: {args.output}")
         
     except Exception as e:
@@ -257,9 +431,6 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
-    finally:
-        if jpype.isJVMStarted():
-            jpype.shutdownJVM()
 
 
 if __name__ == "__main__":
@@ -3,24 +3,63 @@
 Gantt Chart Visualizer for MS Project Excel exports
 Reads Excel files exported from MS Project and creates interactive Gantt charts
 """
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import argparse
+import io
+import os
+import re
 import sys
 
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# Number and unit of a duration string, e.g. "40.0eh" or "5 d"
+DURATION_PATTERN = re.compile(r'^([\d.]+)\s*([a-z]+)')
+
+# Days per unit, keyed by the first letter of the unit
+DAYS_PER_UNIT = {
+    'd': 1,      # days
+    'h': 1 / 8,  # hours, 8 hours per day
+    'e': 1 / 8,  # elapsed hours (eh)
+    'w': 5,      # weeks, 5 days per week
+    'm': 20,     # months, 20 days per month (approx)
+}
+
+
+def get_excel_engine(file_path):
+    """Pick the fastest available pandas engine for reading an Excel file"""
+    if CALAMINE_AVAILABLE:
+        return 'calamine'
+    if not isinstance(file_path, (str, os.PathLike)):
+        return None  # file-like input: let pandas detect the format
+    return 'xlrd' if str(file_path).lower().endswith('.xls') else 'openpyxl'
+
+
+def open_excel_file(excel_file):
+    """Load a workbook into memory once so several sheets can be read from it"""
+    if isinstance(excel_file, pd.ExcelFile):
+        return excel_file
+    engine = get_excel_engine(excel_file)
+    if isinstance(excel_file, (str, os.PathLike)):
+        with open(excel_file, 'rb') as f:
+            excel_file = io.BytesIO(f.read())
+    return pd.ExcelFile(excel_file, engine=engine)
+
 
 def parse_duration(duration_str):
     """Convert MS Project duration format to days"""
     if not duration_str or pd.isna(duration_str):
         return 0
     
-    duration_str = str(duration_str).lower()
-    
     # Extract number and unit
-    import re
-    match = re.match(r'([\d.]+)\s*([a-z]+)', duration_str)
+    match = DURATION_PATTERN.match(str(duration_str).lower())
     if not match:
         return 0
     
@@ -28,32 +67,28 @@ def parse_duration(duration_str):
     unit = match.group(2)
     
     # Convert to days
-    if unit.startswith('d'):  # days
-        return value
-    elif unit.startswith('h') or unit.startswith('e'):  # hours (eh = elapsed hours)
-        return value / 8  # 8 hours per day
-    elif unit.startswith('w'):  # weeks
-        return value * 5  # 5 days per week
-    elif unit.startswith('m'):  # months
-        return value * 20  # 20 days per month (approx)
-    else:
-        return value
+    return value * DAYS_PER_UNIT.get(unit[0], 1)
+
+
+def column_as_text(df, column, default='N/A'):
+    """Return a column as strings, using a default for missing values"""
+    if column not in df.columns:
+        return default
+    return df[column].fillna(default).astype(str)
 
 
 def prepare_gantt_data(excel_file, sheet_name='Tasks'):
     """Read Excel file and prepare data for Gantt chart"""
     
+    xl_file = open_excel_file(excel_file)
+    
     # Detectar si es archivo del conversor corregido
-    try:
-        xl_file = pd.ExcelFile(excel_file)
-        if 'Tasks_Corrected' in xl_file.sheet_names:
-            sheet_name = 'Tasks_Corrected'
-            print(f"✓ Detected corrected converter file, using sheet: {sheet_name}")
-    except:
-        pass
+    if 'Tasks_Corrected' in xl_file.sheet_names:
+        sheet_name = 'Tasks_Corrected'
+        print(f"✓ Detected corrected converter file, using sheet: {sheet_name}")
     
     # Read Excel file
-    df = pd.read_excel(excel_file, sheet_name=sheet_name)
+    df = pd.read_excel(xl_file, sheet_name=sheet_name)
     
     # Adaptar columnas según el tipo de archivo
     if 'Duration_Corrected' in df.columns:
@@ -73,8 +108,14 @@ def prepare_gantt_data(excel_file, sheet_name='Tasks'):
     
     # Parse dates - handle different formats
     for col in ['Start', 'Finish']:
-        # Try to parse as string first
-        df[col] = pd.to_datetime(df[col], errors='coerce')
+        # MPXJ exports ISO 8601 timestamps, which have a fast C parser
+        parsed = pd.to_datetime(df[col], format='ISO8601', errors='coerce', cache=True)
+        
+        # Fall back to format inference for anything else
+        unparsed = parsed.isna() & df[col].notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(df.loc[unparsed, col], errors='coerce', cache=True)
+        df[col] = parsed
     
     # Add completion status for coloring
     df['Status'] = df['Percent Complete'].apply(
@@ -86,23 +127,25 @@ def prepare_gantt_data(excel_file, sheet_name='Tasks'):
     # Create hover text adaptado
     duration_info = df['Duration'] if 'Duration' in df.columns else 'N/A'
     
-    df['HoverText'] = df.apply(
-        lambda row: (
-            f"<b>{row['Name']}</b><br>"
-            f"WBS: {row.get('WBS', 'N/A')}<br>"
-            f"Duration: {row.get('Duration', 'N/A')}<br>"
-            f"Progress: {row['Percent Complete']:.0f}%<br>"
-            f"Resources: {row.get('Resource Names', 'N/A')}<br>"
-            f"Predecessors: {row.get('Predecessors', 'N/A')}<br>"
-            + (f"Source: {row['Duration_Source']}<br>" if 'Duration_Source' in df.columns else "")
-        ), axis=1
+    df['HoverText'] = (
+        "<b>" + column_as_text(df, 'Name') + "</b><br>"
+        + "WBS: " + column_as_text(df, 'WBS') + "<br>"
+        + "Duration: " + column_as_text(df, 'Duration') + "<br>"
+        + "Progress: " + df['Percent Complete'].map('{:.0f}'.format) + "%<br>"
+        + "Resources: " + column_as_text(df, 'Resource Names') + "<br>"
+        + "Predecessors: " + column_as_text(df, 'Predecessors') + "<br>"
     )
+    if 'Duration_Source' in df.columns:
+        df['HoverText'] += "Source: " + column_as_text(df, 'Duration_Source') + "<br>"
     
     # Add hierarchy levels for better visualization
-    df['DisplayName'] = df.apply(
-        lambda row: '  ' * int(row.get('Outline Level', 0)) + row['Name'], 
-        axis=1
-    )
+    if 'Outline Level' in df.columns:
+        levels = df['Outline Level'].fillna(0).astype(int).clip(lower=0).to_numpy()
+        max_level = int(levels.max()) if len(levels) else 0
+        indents = np.array(['  ' * level for level in range(max_level + 1)], dtype=object)
+        df['DisplayName'] = indents[levels] + column_as_text(df, 'Name', '').to_numpy(dtype=object)
+    else:
+        df['DisplayName'] = column_as_text(df, 'Name', '')
     
     return df
 
@@ -154,16 +197,21 @@ def create_gantt_chart(df, title='Project Gantt Chart'):
     # Add critical path highlighting
     critical_tasks = df[df['Critical'] == True]
     if not critical_tasks.empty:
-        for _, task in critical_tasks.iterrows():
-            fig.add_shape(
+        # Assign all shapes at once; add_shape re-validates the layout per call
+        fig.update_layout(shapes=[
+            dict(
                 type='rect',
-                x0=task['Start'],
-                x1=task['Finish'],
-                y0=task['DisplayName'],
-                y1=task['DisplayName'],
+                x0=start,
+                x1=finish,
+                y0=name,
+                y1=name,
                 line=dict(color='red', width=3),
                 fillcolor='rgba(255,0,0,0.1)'
             )
+            for start, finish, name in zip(critical_tasks['Start'],
+                                           critical_tasks['Finish'],
+                                           critical_tasks['DisplayName'])
+        ])
     
     # Add milestone markers
     milestones = df[df['Milestone'] == True]
@@ -189,7 +237,7 @@ def create_resource_chart(excel_file):
     """Create resource allocation chart"""
     try:
         # Intentar leer hoja de recursos
-        xl_file = pd.ExcelFile(excel_file)
+        xl_file = open_excel_file(excel_file)
         resource_sheet = None
         
         # Buscar hoja de recursos
@@ -199,7 +247,7 @@ def create_resource_chart(excel_file):
                 break
         
         if resource_sheet:
-            resources_df = pd.read_excel(excel_file, sheet_name=resource_sheet)
+            resources_df = pd.read_excel(xl_file, sheet_name=resource_sheet)
             print(f"✓ Found resource sheet: {resource_sheet}")
         else:
             print("⚠️ No resource sheet found")
@@ -247,14 +295,22 @@ def main():
                         help='Include resource chart')
     parser.add_argument('--sheet-name', help='Name of Excel sheet to read',
                         default='Tasks')
+    parser.add_argument('--embed-plotlyjs', action='store_true',
+                        help='Embed plotly.js in the HTML for offline viewing '
+                             '(default loads it from the CDN)')
     
     args = parser.parse_args()
     
+    # write_html serializes through orjson when it is installed (Plotly's
+    # 'auto' JSON engine); plotly.js itself is loaded from the CDN by default
+    include_plotlyjs = True if args.embed_plotlyjs else 'cdn'
+    
     try:
         print(f"Reading Excel file: {args.excel_file}")
+        xl_file = open_excel_file(args.excel_file)
         
         # Prepare data
-        df = prepare_gantt_data(args.excel_file, args.sheet_name)
+        df = prepare_gantt_data(xl_file, args.sheet_name)
         
         print(f"Found {len(df)} tasks with valid dates")
         
@@ -263,7 +319,7 @@ def main():
         
         if args.resources:
             # Create resource chart
-            resource_fig = create_resource_chart(args.excel_file)
+            resource_fig = create_resource_chart(xl_file)
             
             if resource_fig:
                 # Create subplot with both charts
@@ -283,11 +339,11 @@ def main():
                     fig.add_trace(trace, row=2, col=1)
                 
                 fig.update_layout(height=1000, showlegend=True)
-                fig.write_html(args.output)
+                fig.write_html(args.output, include_plotlyjs=include_plotlyjs)
             else:
-                gantt_fig.write_html(args.output)
+                gantt_fig.write_html(args.output, include_plotlyjs=include_plotlyjs)
         else:
-            gantt_fig.write_html(args.output)
+            gantt_fig.write_html(args.output, include_plotlyjs=include_plotlyjs)
         
         print(f"✓ Gantt chart saved to: {args.output}")
         
@@ -10,6 +10,19 @@ import sys
 import os
 from pathlib import Path
 import argparse
+from openpyxl.utils import get_column_letter
+
+try:
+    import xlsxwriter  # noqa: F401
+    EXCEL_WRITE_ENGINE = 'xlsxwriter'
+except ImportError:
+    EXCEL_WRITE_ENGINE = 'openpyxl'
+
+# Start with a heap large enough for big schedules; the maximum stays at the
+# JVM default (a quarter of RAM) and can be raised with
+# JAVA_TOOL_OPTIONS=-Xmx<size>. The JVM is started once per process and JPype
+# shuts it down at interpreter exit.
+JVM_OPTIONS = ['-Xms512m', '-XX:+UseG1GC']
 
 
 def setup_jvm():
@@ -22,7 +35,8 @@ def setup_jvm():
         if not jar_files:
             raise RuntimeError("No JAR files found in mpxj package")
         
-        jpype.startJVM(classpath=[str(jar) for jar in jar_files])
+        jpype.startJVM(*JVM_OPTIONS, classpath=[str(jar) for jar in jar_files],
+                       convertStrings=True)
 
 
 def format_predecessors(predecessors):
@@ -58,6 +72,23 @@ def format_predecessors(predecessors):
     return '; '.join(formatted)
 
 
+def extract_resources(project):
+    """Extract resource information from an MPXJ project"""
+    resources_data = []
+    for resource in project.getResources():
+        if resource and resource.getName():
+            resources_data.append({
+                'ID': resource.getID() if resource.getID() else 0,
+                'Name': str(resource.getName()),
+                'Type': str(resource.getType()) if resource.getType() else '',
+                'Cost': (resource.getCost().doubleValue()
+                         if resource.getCost() else 0),
+                'Standard Rate': (str(resource.getStandardRate())
+                                  if resource.getStandardRate() else '')
+            })
+    return resources_data
+
+
 def read_ms_project(file_path):
     """Read MS Project file and extract task information"""
     setup_jvm()
@@ -102,48 +133,43 @@ def read_ms_project(file_path):
         
         tasks_data.append(task_data)
     
-    return tasks_data, project
+    resources_data = extract_resources(project)
+    
+    return tasks_data, resources_data
+
 
+def get_column_widths(df):
+    """Column widths sized to the longest value or header, capped at 50"""
+    value_lengths = (df.astype(str)
+                     .apply(lambda column: column.str.len())
+                     .where(df.notna(), 0)
+                     .max())
+    return [min(max(int(value_length), len(str(header))) + 2, 50)
+            for header, value_length in zip(df.columns, value_lengths.fillna(0))]
 
-def export_to_xlsx(tasks_df, project, output_file):
+
+def set_column_widths(worksheet, widths):
+    """Apply column widths to an xlsxwriter or openpyxl worksheet"""
+    for i, width in enumerate(widths):
+        if EXCEL_WRITE_ENGINE == 'xlsxwriter':
+            worksheet.set_column(i, i, width)
+        else:
+            worksheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+
+def export_to_xlsx(tasks_df, resources_data, output_file):
     """Export project data to XLSX file with formatting"""
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    with pd.ExcelWriter(output_file, engine=EXCEL_WRITE_ENGINE) as writer:
         # Write tasks
         tasks_df.to_excel(writer, sheet_name='Tasks', index=False)
         
         # Auto-adjust column widths
-        worksheet = writer.sheets['Tasks']
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except Exception:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
-    # Add resources
-    resources_data = []
-    for resource in project.getResources():
-        if resource and resource.getName():
-            resources_data.append({
-                'ID': resource.getID() if resource.getID() else 0,
-                'Name': str(resource.getName()),
-                'Type': str(resource.getType()) if resource.getType() else '',
-                'Cost': (resource.getCost().doubleValue()
-                         if resource.getCost() else 0),
-                'Standard Rate': (str(resource.getStandardRate())
-                                  if resource.getStandardRate() else '')
-            })
-    
-    if resources_data:
-        resources_df = pd.DataFrame(resources_data)
-        with pd.ExcelWriter(output_file, mode='a',
-                            engine='openpyxl', if_sheet_exists='new') as writer:
+        set_column_widths(writer.sheets['Tasks'], get_column_widths(tasks_df))
+        
+        # Add resources
+        if resources_data:
+            resources_df = pd.DataFrame(resources_data)
             resources_df.to_excel(writer, sheet_name='Resources', index=False)
 
 
@@ -173,7 +199,7 @@ def main():
     
     try:
         # Read project
-        tasks_data, project = read_ms_project(args.input_file)
+        tasks_data, resources_data = read_ms_project(args.input_file)
         
         if not tasks_data:
             print("No tasks found in project file!")
@@ -189,15 +215,12 @@ def main():
             print(f"Critical Tasks: {tasks_df['Critical'].sum()}")
             
         # Export to Excel
-        export_to_xlsx(tasks_df, project, output_file)
+        export_to_xlsx(tasks_df, resources_data, output_file)
         print(f"✓ Exported to: {output_file}")
         
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
-    finally:
-        if jpype.isJVMStarted():
-            jpype.shutdownJVM()
 
 
 if __name__ == "__main__":
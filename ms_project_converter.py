@@ -1,14 +1,58 @@
 #!/usr/bin/env python3
 import jpype
 import jpype.imports
+import numpy as np
 import pandas as pd
 import sys
 import os
+import argparse
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 
+try:
+    from pyexcelerate import Workbook as FastWorkbook, Style, Font, Color
+    from pyexcelerate.Border import Border
+    from pyexcelerate.Borders import Borders
+    PYEXCELERATE_AVAILABLE = True
+except ImportError:
+    PYEXCELERATE_AVAILABLE = False
 
-def setup_jvm():
-    """Setup JVM with MPXJ"""
+
+# Same heap settings as the other converters; the batch path parses several
+# projects at once, so the maximum is left at the JVM default (a quarter of
+# RAM) and can be raised with JAVA_TOOL_OPTIONS=-Xmx<size>.
+JVM_OPTIONS = ['-Xms512m', '-XX:+UseG1GC']
+
+# A single-file run executes MPXJ once, so the C1 compiler alone warms up
+# faster than waiting on full C2 optimization. Batch runs and library callers
+# reuse the JVM and keep the default tiered compiler.
+SINGLE_RUN_JVM_OPTIONS = ['-XX:+TieredCompilation', '-XX:TieredStopAtLevel=1']
+
+# Column order of the Tasks sheet
+TASK_COLUMNS = ['ID', 'Name', 'Duration', 'Start', 'Finish', 'Percent Complete',
+                'Predecessors', 'Resource Names', 'Cost', 'Work', 'Critical',
+                'Milestone', 'Summary', 'Notes', 'WBS', 'Outline Level']
+
+# The JVM cannot be restarted within a process, so it is started once and kept
+# alive for every conversion; JPype shuts it down at interpreter exit.
+_JVM_READY = False
+
+# Java classes looked up by _java()
+_JAVA = {}
+
+
+def setup_jvm(jvm_options=()):
+    """Setup JVM with MPXJ (started once per process)"""
+    global _JVM_READY
+    if _JVM_READY:
+        return
+    
     if not jpype.isJVMStarted():
         # Use the mpxj module's JAR files
         import mpxj
@@ -22,8 +66,14 @@ def setup_jvm():
         
         print(f"Found {len(jar_files)} JAR files in mpxj package")
         
-        # Start JVM with all JAR files
-        jpype.startJVM(classpath=[str(jar) for jar in jar_files])
+        # Start JVM with all JAR files; convertStrings returns java.lang.String
+        # results as Python str directly instead of one proxy per call. The
+        # str() calls on string fields stay, since an embedding caller may
+        # have started the JVM without it.
+        jpype.startJVM(*JVM_OPTIONS, *jvm_options, classpath=[str(jar) for jar in jar_files],
+                       convertStrings=True)
+    
+    _JVM_READY = True
 
 
 def format_predecessors(predecessors):
@@ -38,133 +88,167 @@ def format_predecessors(predecessors):
         task_id = pred_task.getID() if pred_task else 'Unknown'
         
         # Get relationship type (FS, SS, SF, FF)
-        rel_type = str(relation.getType()) if relation.getType() else 'FS'
+        rel_type = relation.getType()
+        rel_type = str(rel_type) if rel_type else 'FS'
         
         # Get lag
         lag = relation.getLag()
-        lag_str = ''
-        if lag and lag.getDuration() != 0:
-            lag_value = lag.getDuration()
-            lag_units = str(lag.getUnits()) if lag.getUnits() else 'd'
-            
-            # Format based on sign
-            if lag_value > 0:
-                lag_str = f"+{int(lag_value)}{lag_units}"
-            else:
-                lag_str = f"{int(lag_value)}{lag_units}"
+        lag_value = lag.getDuration() if lag else 0
+        if lag_value == 0:
+            # Most relations have no lag (e.g., "3FS")
+            formatted.append(f"{task_id}{rel_type}")
+            continue
+        
+        lag_units = lag.getUnits()
+        lag_units = str(lag_units) if lag_units else 'd'
         
-        # Create formatted string (e.g., "3FS", "5SS+2d")
-        formatted.append(f"{task_id}{rel_type}{lag_str}")
+        # Format based on sign (e.g., "5SS+2d", "7FS-1d")
+        sign = '+' if lag_value > 0 else ''
+        formatted.append(f"{task_id}{rel_type}{sign}{int(lag_value)}{lag_units}")
     
     return '; '.join(formatted)
 
 
-def read_ms_project(file_path):
-    """Read MS Project file and extract task information"""
-    setup_jvm()
-    
-    # Import Java classes using JPackage
-    org = jpype.JPackage("org")
-    UniversalProjectReader = org.mpxj.reader.UniversalProjectReader
-    
+def _java():
+    """MPXJ classes used by the converter, resolved once after JVM startup"""
+    if not _JAVA:
+        setup_jvm()
+        # Filled in one update so batch worker threads never see a partial dict
+        _JAVA.update({
+            'UniversalProjectReader': jpype.JClass(
+                'org.mpxj.reader.UniversalProjectReader'),
+        })
+    return _JAVA
+
+
+def load_project(file_path):
+    """Parse an MS Project file with MPXJ"""
     # Read the project
-    reader = UniversalProjectReader()
-    project = reader.read(file_path)
+    reader = _java()['UniversalProjectReader']()
+    return reader.read(file_path)
+
+
+def read_ms_project(file_path, project=None):
+    """Read MS Project file and extract task information into a DataFrame"""
+    if project is None:
+        project = load_project(file_path)
+    
+    task_list = project.getTasks().toArray()
+    n = len(task_list)
     
-    tasks_data = []
+    # One pre-allocated column per field; numeric and flag columns get typed
+    # arrays so pandas does not fall back to object dtype
+    ids = np.empty(n, dtype=np.int64)
+    names = [None] * n
+    durations = [None] * n
+    starts = [None] * n
+    finishes = [None] * n
+    percent_complete = np.empty(n, dtype=np.float64)
+    predecessors = [None] * n
+    resource_names = [None] * n
+    costs = np.empty(n, dtype=np.float64)
+    works = [None] * n
+    criticals = np.empty(n, dtype=bool)
+    milestones = np.empty(n, dtype=bool)
+    summaries = np.empty(n, dtype=bool)
+    notes = [None] * n
+    wbs = [None] * n
+    outline_levels = np.empty(n, dtype=np.int64)
     
-    # Process tasks
-    for task in project.getTasks():
+    # Process tasks; toArray() hands the whole task list over in a single
+    # Java call instead of one iterator round-trip per task
+    i = 0
+    for task in task_list:
         if task is None:
             continue
-            
-        task_data = {
-            'ID': task.getID() if task.getID() else 0,
-            'Name': str(task.getName()) if task.getName() else '',
-            'Duration': str(task.getDuration()) if task.getDuration() else '',
-            'Start': str(task.getStart()) if task.getStart() else '',
-            'Finish': str(task.getFinish()) if task.getFinish() else '',
-            'Percent Complete': (task.getPercentageComplete().doubleValue()
-                                 if task.getPercentageComplete() else 0),
-            'Predecessors': format_predecessors(task.getPredecessors()),
-            'Resource Names': (str(task.getResourceNames())
-                               if task.getResourceNames() else ''),
-            'Cost': (task.getCost().doubleValue()
-                     if task.getCost() else 0),
-            'Work': str(task.getWork()) if task.getWork() else '',
-            'Critical': bool(task.getCritical()) if task.getCritical() else False,
-            'Milestone': bool(task.getMilestone()) if task.getMilestone() else False,
-            'Summary': bool(task.getSummary()) if task.getSummary() else False,
-            'Notes': str(task.getNotes()) if task.getNotes() else '',
-            'WBS': str(task.getWBS()) if task.getWBS() else '',
-            'Outline Level': (task.getOutlineLevel().intValue()
-                              if task.getOutlineLevel() else 0)
-        }
         
-        tasks_data.append(task_data)
+        # Each getter is a Java call, so read every field exactly once
+        task_id = task.getID()
+        ids[i] = task_id if task_id else 0
+        name = task.getName()
+        names[i] = str(name) if name else ''
+        duration = task.getDuration()
+        durations[i] = str(duration) if duration else ''
+        start = task.getStart()
+        starts[i] = str(start) if start else ''
+        finish = task.getFinish()
+        finishes[i] = str(finish) if finish else ''
+        percent = task.getPercentageComplete()
+        percent_complete[i] = percent.doubleValue() if percent else 0
+        # Most tasks have no predecessors; skip formatting them altogether
+        preds = task.getPredecessors()
+        predecessors[i] = (format_predecessors(preds)
+                           if preds is not None and not preds.isEmpty() else '')
+        resources = task.getResourceNames()
+        resource_names[i] = str(resources) if resources else ''
+        cost = task.getCost()
+        costs[i] = cost.doubleValue() if cost else 0
+        work = task.getWork()
+        works[i] = str(work) if work else ''
+        # Null flags read as False
+        criticals[i] = bool(task.getCritical())
+        milestones[i] = bool(task.getMilestone())
+        summaries[i] = bool(task.getSummary())
+        note = task.getNotes()
+        notes[i] = str(note) if note else ''
+        task_wbs = task.getWBS()
+        wbs[i] = str(task_wbs) if task_wbs else ''
+        outline_level = task.getOutlineLevel()
+        outline_levels[i] = outline_level.intValue() if outline_level else 0
+        i += 1
+    
+    # Drop the unused tail left by skipped null tasks
+    columns = [ids, names, durations, starts, finishes, percent_complete,
+               predecessors, resource_names, costs, works, criticals,
+               milestones, summaries, notes, wbs, outline_levels]
+    tasks_df = pd.DataFrame({name: column[:i]
+                             for name, column in zip(TASK_COLUMNS, columns)})
     
-    return tasks_data, project
+    return tasks_df, project
 
 
 def visualize_project_summary(tasks_df):
     """Print project summary information"""
-    print("\n=== PROJECT SUMMARY ===")
-    print(f"Total Tasks: {len(tasks_df)}")
-    print(f"Milestones: {tasks_df['Milestone'].sum()}")
-    print(f"Summary Tasks: {tasks_df['Summary'].sum()}")
-    print(f"Critical Tasks: {tasks_df['Critical'].sum()}")
-    print(f"Average Completion: {tasks_df['Percent Complete'].mean():.1f}%")
-    
-    print("\n=== TASK HIERARCHY ===")
-    # Show tasks with outline levels for hierarchy
-    hierarchy_view = tasks_df[['WBS', 'Name', 'Duration', 'Start', 'Finish',
-                                'Percent Complete', 'Outline Level']].copy()
+    # Build the whole report and write it to stdout once
+    report = io.StringIO()
+    print("\n=== PROJECT SUMMARY ===", file=report)
+    # All summary figures from a single agg call over the typed columns
+    stats = tasks_df.agg({'Milestone': 'sum', 'Summary': 'sum',
+                          'Critical': 'sum', 'Percent Complete': 'mean'})
+    print(f"Total Tasks: {len(tasks_df)}", file=report)
+    print(f"Milestones: {int(stats['Milestone'])}", file=report)
+    print(f"Summary Tasks: {int(stats['Summary'])}", file=report)
+    print(f"Critical Tasks: {int(stats['Critical'])}", file=report)
+    print(f"Average Completion: {stats['Percent Complete']:.1f}%", file=report)
+    
+    print("\n=== TASK HIERARCHY ===", file=report)
+    # Show the first tasks with outline levels for hierarchy; only the
+    # displayed rows are indented
+    hierarchy_view = tasks_df[['WBS', 'Name', 'Duration', 'Percent Complete',
+                               'Outline Level']].head(30).copy()
     
     # Add indentation based on outline level
-    hierarchy_view['Name'] = hierarchy_view.apply(
-        lambda x: '  ' * x['Outline Level'] + x['Name'], axis=1
-    )
+    hierarchy_view['Name'] = [
+        '  ' * int(level) + name
+        for level, name in zip(hierarchy_view['Outline Level'].to_numpy(),
+                               hierarchy_view['Name'].to_numpy())
+    ]
     
     print(hierarchy_view[['WBS', 'Name', 'Duration',
-                          'Percent Complete']].head(30).to_string())
+                          'Percent Complete']].to_string(), file=report)
+    
+    sys.stdout.write(report.getvalue())
 
 
-def export_to_xlsx(tasks_df, project, output_file):
-    """Export project data to XLSX file with formatting"""
-    
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        # Write tasks to Excel
-        tasks_df.to_excel(writer, sheet_name='Tasks', index=False)
-        
-        # Auto-adjust column widths
-        worksheet = writer.sheets['Tasks']
-        
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except Exception:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        # Style header row
-        for row in worksheet.iter_rows(min_row=1, max_row=1):
-            for cell in row:
-                cell.style = 'Headline 3'
-    
-    # Add resources sheet
+def extract_resources(project):
+    """Extract resource information from an MPXJ project"""
     resources_data = []
     for resource in project.getResources():
-        if resource and resource.getName():
+        name = resource.getName() if resource else None
+        if name:
             resources_data.append({
                 'ID': resource.getID() if resource.getID() else 0,
-                'Name': str(resource.getName()),
+                'Name': str(name),
                 'Type': str(resource.getType()) if resource.getType() else '',
                 'Cost': (resource.getCost().doubleValue()
                          if resource.getCost() else 0),
@@ -173,66 +257,206 @@ def export_to_xlsx(tasks_df, project, output_file):
                 'Max Units': (resource.getMaxUnits().doubleValue()
                               if resource.getMaxUnits() else 100)
             })
+    return resources_data
+
+
+def write_xlsx_pyexcelerate(output_file, headers, rows, widths, resources_df):
+    """Write the Tasks and Resources sheets with pyexcelerate"""
+    workbook = FastWorkbook()
+    worksheet = workbook.new_sheet('Tasks', data=[headers] + rows)
+    
+    # Same look as openpyxl's 'Headline 3' named style
+    worksheet.set_row_style(1, Style(
+        font=Font(bold=True, color=Color(0x1F, 0x49, 0x7D)),
+        borders=Borders(bottom=Border(color=Color(0x95, 0xB3, 0xD7),
+                                      style='medium'))
+    ))
+    for col, width in enumerate(widths, 1):
+        worksheet.set_col_style(col, Style(size=width))
+    
+    if resources_df is not None:
+        workbook.new_sheet('Resources', data=[list(resources_df.columns)] +
+                           list(resources_df.itertuples(index=False, name=None)))
     
-    if resources_data:
-        resources_df = pd.DataFrame(resources_data)
-        with pd.ExcelWriter(output_file, mode='a',
-                            engine='openpyxl', if_sheet_exists='new') as writer:
-            resources_df.to_excel(writer, sheet_name='Resources', index=False)
+    workbook.save(output_file)
+
+
+def write_xlsx_openpyxl(output_file, headers, rows, widths, resources_df):
+    """Write the Tasks and Resources sheets with a write-only openpyxl workbook"""
+    # Write-only workbook: rows are streamed to disk instead of kept as cells
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Tasks')
+    
+    # A write-only sheet needs its column widths before the first row
+    for col, width in enumerate(widths, 1):
+        worksheet.column_dimensions[get_column_letter(col)].width = width
+    
+    # Style header row
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(worksheet, value=header)
+        cell.style = 'Headline 3'
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+    
+    for row in rows:
+        worksheet.append(row)
+    
+    if resources_df is not None:
+        resources_sheet = workbook.create_sheet('Resources')
+        resources_sheet.append(list(resources_df.columns))
+        for row in resources_df.itertuples(index=False, name=None):
+            resources_sheet.append(row)
+    
+    workbook.save(output_file)
+
+
+def export_to_xlsx(tasks_df, project, output_file):
+    """Export project data to XLSX file with formatting"""
+    headers = list(tasks_df.columns)
+    rows = list(tasks_df.itertuples(index=False, name=None))
+    
+    # Auto-adjust column widths, measured a column at a time instead of
+    # calling str() cell by cell
+    widths = [
+        min(max(len(header), tasks_df[header].astype(str).str.len().max()) + 2, 50)
+        for header in headers
+    ]
+    
+    # Resources are gathered up front so both sheets go into one workbook save
+    resources_data = extract_resources(project)
+    resources_df = pd.DataFrame(resources_data) if resources_data else None
+    
+    if PYEXCELERATE_AVAILABLE:
+        write_xlsx_pyexcelerate(output_file, headers, rows, widths, resources_df)
+    else:
+        write_xlsx_openpyxl(output_file, headers, rows, widths, resources_df)
     
     print(f"\nProject exported successfully to: {output_file}")
 
 
-def main():
-    mpp_file = ('/Users/fernandosimich/Desktop/Workspacegit/MS-Project/'
-                'Programa FCC II 2025 Rev 5 19-6 FALTA AFINAR PEM Y DETALLES.mpp')
-    output_file = ('/Users/fernandosimich/Desktop/Workspacegit/MS-Project/'
-                   'proyecto_exportado.xlsx')
+def convert_project(mpp_file, output_file, project=None):
+    """Convert a single .mpp file to XLSX, reusing the running JVM"""
+    # Read project data
+    tasks_df, project = read_ms_project(mpp_file, project)
     
-    if not os.path.exists(mpp_file):
-        print(f"Error: File not found - {mpp_file}")
-        sys.exit(1)
+    if tasks_df.empty:
+        print("No tasks found in the project file!")
+        return False
     
-    print(f"Reading MS Project file: {os.path.basename(mpp_file)}")
+    # Visualize summary
+    visualize_project_summary(tasks_df)
     
-    try:
-        # Read project data
-        tasks_data, project = read_ms_project(mpp_file)
-        
-        if not tasks_data:
-            print("No tasks found in the project file!")
-            sys.exit(1)
+    # Export to Excel
+    export_to_xlsx(tasks_df, project, output_file)
+    
+    # Show project properties
+    print("\n=== PROJECT PROPERTIES ===")
+    props = project.getProjectProperties()
+    if props.getProjectTitle():
+        print(f"Project Title: {props.getProjectTitle()}")
+    if props.getManager():
+        print(f"Project Manager: {props.getManager()}")
+    if props.getStartDate():
+        print(f"Start Date: {props.getStartDate()}")
+    if props.getFinishDate():
+        print(f"Finish Date: {props.getFinishDate()}")
+    
+    return True
+
+
+def run_batch(lines, workers=4):
+    """Convert each .mpp path read from lines, paying the JVM startup once"""
+    _java()
+    
+    # MPXJ parsing runs in Java with the GIL released. A reader thread submits
+    # each path as soon as it arrives, so up to `workers` files are parsed
+    # ahead while this thread extracts and exports them in order; the bounded
+    # queue also caps how many parsed projects are alive at once.
+    pending = queue.Queue(maxsize=workers)
+    
+    def submit_paths(pool):
+        try:
+            for line in lines:
+                mpp_file = line.strip()
+                if not mpp_file:
+                    continue
+                future = (pool.submit(load_project, mpp_file)
+                          if os.path.exists(mpp_file) else None)
+                pending.put((mpp_file, future))
+        finally:
+            pending.put(None)
+    
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        reader = threading.Thread(target=submit_paths, args=(pool,),
+                                  daemon=True)
+        reader.start()
         
-        # Convert to DataFrame
-        tasks_df = pd.DataFrame(tasks_data)
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            
+            mpp_file, future = item
+            output_file = str(Path(mpp_file).with_suffix('.xlsx'))
+            print(f"Reading MS Project file: {os.path.basename(mpp_file)}")
+            
+            try:
+                if future is None:
+                    raise FileNotFoundError(f"File not found - {mpp_file}")
+                if not convert_project(mpp_file, output_file, future.result()):
+                    failures += 1
+            except Exception as e:
+                print(f"Error processing file: {str(e)}")
+                failures += 1
+            
+            # Release the parsed project before waiting for the next one
+            item = future = None
+    
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert MS Project files to XLSX format'
+    )
+    parser.add_argument('--batch', action='store_true',
+                        help='Read .mpp paths from stdin (one per line) and '
+                             'convert each next to its source in one JVM')
+    parser.add_argument('--shutdown-jvm', action='store_true',
+                        help='Shut the JVM down explicitly before exiting '
+                             '(by default it is left to process exit)')
+    args = parser.parse_args()
+    
+    try:
+        if args.batch:
+            sys.exit(1 if run_batch(sys.stdin) else 0)
         
-        # Visualize summary
-        visualize_project_summary(tasks_df)
+        mpp_file = ('/Users/fernandosimich/Desktop/Workspacegit/MS-Project/'
+                    'Programa FCC II 2025 Rev 5 19-6 FALTA AFINAR PEM Y DETALLES.mpp')
+        output_file = ('/Users/fernandosimich/Desktop/Workspacegit/MS-Project/'
+                       'proyecto_exportado.xlsx')
         
-        # Export to Excel
-        export_to_xlsx(tasks_df, project, output_file)
+        if not os.path.exists(mpp_file):
+            print(f"Error: File not found - {mpp_file}")
+            sys.exit(1)
         
-        # Show project properties
-        print("\n=== PROJECT PROPERTIES ===")
-        props = project.getProjectProperties()
-        if props.getProjectTitle():
-            print(f"Project Title: {props.getProjectTitle()}")
-        if props.getManager():
-            print(f"Project Manager: {props.getManager()}")
-        if props.getStartDate():
-            print(f"Start Date: {props.getStartDate()}")
-        if props.getFinishDate():
-            print(f"Finish Date: {props.getFinishDate()}")
+        print(f"Reading MS Project file: {os.path.basename(mpp_file)}")
         
-    except Exception as e:
-        print(f"Error processing file: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        try:
+            setup_jvm(SINGLE_RUN_JVM_OPTIONS)
+            if not convert_project(mpp_file, output_file):
+                sys.exit(1)
+        except Exception as e:
+            print(f"Error processing file: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
     finally:
-        if jpype.isJVMStarted():
+        if args.shutdown_jvm and jpype.isJVMStarted():
             jpype.shutdownJVM()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()